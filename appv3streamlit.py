@@ -3,43 +3,174 @@
 Streamlit app for University Schedule Chatbot
 """
 
+import copy
+import hashlib
+import json
+import os
+import re
 import streamlit as st
 import spacy
 import pandas as pd
-from datetime import datetime, time
+import numpy as np
+from datetime import time
 import random
+from collections import deque
+from functools import lru_cache
 from spacy.matcher import PhraseMatcher
 import pickle
-from config import LANGUAGES, UNIVERSITY_TERMS
+import joblib
+import ahocorasick
+from config import LANGUAGES, NLP_CACHE_DIR, UNIVERSITY_TERMS
 from data_loader2 import load_schedule_data
-from fuzzywuzzy import fuzz, process
+from rapidfuzz import fuzz, process, utils
+
+TR_WORDS = ('ders', 'hoca', 'vize', 'final')
+FUZZY_THRESHOLD = 70
+# fuzzywuzzy rounded scores to an int before comparing, so a raw score of 69.5 already passed
+FUZZY_SCORE_CUTOFF = FUZZY_THRESHOLD - 0.5
+# Only tokens, lemmas and entities are used; the dependency parser is never consulted
+DISABLED_PIPES = ['parser']
+
+
+@lru_cache(maxsize=256)
+def _detect_language(normalized):
+    return 'tr' if any(word in normalized for word in TR_WORDS) else 'en'
+
+
+# fuzzywuzzy's force_ascii only removes code points 128-255: ö, ü and ç go, ğ, ş and ı stay
+_LATIN1_STRIP = {code: None for code in range(128, 256)}
+
+
+def _fuzzy_process(text):
+    # Mirrors fuzzywuzzy's full_process(force_ascii=True): strip code points 128-255, then
+    # lowercase, replace non-alphanumerics with spaces and trim
+    return utils.default_process(text.translate(_LATIN1_STRIP))
+
+
+def _newest_mtime(path):
+    # Retraining overwrites files inside the model directory without touching the directory itself
+    mtimes = [os.path.getmtime(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files]
+    return max(mtimes, default=0)
+
+
+# (pickle source, memory-mappable joblib copy) for the intent classifier and vectorizer
+MODEL_FILES = (
+    ('intent_classifier.pkl', 'intent_classifier.joblib'),
+    ('vectorizer.pkl', 'vectorizer.joblib'),
+)
+
+
+def _load_model(pickle_path, joblib_path):
+    if os.path.exists(joblib_path) and (
+            not os.path.exists(pickle_path) or os.path.getmtime(joblib_path) >= os.path.getmtime(pickle_path)):
+        return joblib.load(joblib_path, mmap_mode='r')
+    with open(pickle_path, 'rb') as f:
+        model = pickle.load(f)
+    # Conversion is best effort: dump to a temp file and swap it in so an interrupted
+    # write never leaves a truncated copy; a read-only directory keeps the unpickled model
+    tmp_path = f"{joblib_path}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, joblib_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return model
+    return joblib.load(joblib_path, mmap_mode='r')
+
+
+@lru_cache(maxsize=1)
+def _load_models():
+    # Loaded once per process and shared by every chatbot instance
+    return tuple(_load_model(pickle_path, joblib_path) for pickle_path, joblib_path in MODEL_FILES)
+
+
+@st.cache_data(ttl=3600)
+def load_schedule(excel_path, mtime):
+    # mtime is part of the cache key so an edited schedule is picked up without a restart
+    return load_schedule_data(excel_path)
+
 
 class UniversityChatbot:
     def __init__(self, excel_path):
         try:
-            self.df = load_schedule_data(excel_path)
+            self._data_mtime = os.path.getmtime(excel_path)
+            self.df = load_schedule(excel_path, self._data_mtime)
         except FileNotFoundError:
             raise FileNotFoundError(f"Excel file {excel_path} not found.")
+        self._build_indexes()
         self.normalized_courses = self._preprocess_courses()
         self.normalized_teachers = self._preprocess_teachers()
         self.normalized_teachers_no_titles = self._preprocess_teachers_no_titles()
+        # Titled and untitled spellings both map to the canonical teacher name
+        self._all_teachers = {**self.normalized_teachers, **self.normalized_teachers_no_titles}
+        self._course_keys = list(self.normalized_courses.keys())
+        self._teacher_keys = list(self._all_teachers.keys())
+        # Preprocessed once; a plain scan over the few dozen teacher keys beats any candidate index
+        self._teacher_choices = [_fuzzy_process(key) for key in self._teacher_keys]
+        self._all_keys, self._all_originals, self._course_span, self._teacher_span = self._build_choice_table()
+        self._all_choices = [_fuzzy_process(key) for key in self._all_keys]
+        self.automaton = self._build_automaton()
         try:
             self.nlp_en = self._setup_nlp('en')
             self.nlp_tr = self._setup_nlp('tr')
         except OSError as e:
             raise OSError(f"Failed to load SpaCy model: {e}")
         try:
-            self.model = pickle.load(open('intent_classifier.pkl', 'rb'))
-            self.vectorizer = pickle.load(open('vectorizer.pkl', 'rb'))
+            self.model, self.vectorizer = _load_models()
         except FileNotFoundError:
             raise FileNotFoundError("ML models not found.")
-        self.context = {
-            'history': [],
+        # Per-instance caches so repeated prompts skip vectorizing and re-parsing
+        self._predict_cached = lru_cache(maxsize=256)(self._predict_normalized)
+        self._parse_cached = lru_cache(maxsize=256)(self._parse)
+        self._buildings = frozenset(UNIVERSITY_TERMS['buildings'])
+        self._exam_kw = {
+            'en': frozenset(['midterm', 'final', 'makeup']),
+            'tr': frozenset(['vize', 'final', 'bütünleme'])
+        }
+        self._followup_re = {
+            'en': re.compile(r'\b(he|she|her|him|it|about)\b'),
+            'tr': re.compile(r'\b(o|onun|ona|hakkında)\b')
+        }
+        self.context = self._empty_context()
+
+    @staticmethod
+    def _empty_context():
+        return {
+            # (teacher, course) per turn, newest last, for resolving follow-up questions
+            'recent': deque(maxlen=5),
             'last_course': None,
             'last_teacher': None,
             'last_day': None
         }
 
+    def new_session(self):
+        # Shares the loaded schedule, pipelines and models; only the conversation context is per session
+        session = copy.copy(self)
+        session.context = self._empty_context()
+        return session
+
+    def _build_indexes(self):
+        self._lectures = self.df[self.df["Exam Type"] == "Lecture"].reset_index(drop=True)
+        self._exams = self.df[self.df["Exam Type"].isin(["Midterm", "Final", "Makeup"])].reset_index(drop=True)
+        self._lecture_by_course = dict(tuple(self._lectures.groupby("Course", observed=True)))
+        self._lecture_by_teacher = dict(tuple(self._lectures.groupby("Teacher", observed=True)))
+        self._lecture_by_day = dict(tuple(self._lectures.groupby("Day", observed=True)))
+        self._lecture_by_course_day = dict(tuple(self._lectures.groupby(["Course", "Day"], observed=True)))
+        self._exams_by_course = dict(tuple(self._exams.groupby("Course", observed=True)))
+        # Conflicts only depend on the schedule; groupby drops rows without a time
+        self._conflicts = [
+            (day, time_obj, group["Course"].tolist())
+            for (day, time_obj), group in self._lectures.groupby(["Day", "Time"], observed=True, sort=False)
+            if len(group) > 1
+        ]
+        # groupby orders (day, time) pairs by first appearance; list each day's slots together,
+        # days in order of first appearance, so replies read as before
+        day_order = {day: i for i, day in enumerate(self._lectures["Day"].unique())}
+        self._conflicts.sort(key=lambda conflict: day_order[conflict[0]])
+
     def _preprocess_courses(self):
         courses = self.df['Course'].unique()
         return {self._normalize_text(course): course for course in courses if isinstance(course, str)}
@@ -61,6 +192,26 @@ class UniversityChatbot:
                 no_title_map[self._normalize_text(no_title)] = teacher
         return no_title_map
 
+    def _build_choice_table(self):
+        # Courses first, then teachers, so one cdist row covers every entity
+        keys = self._course_keys + self._teacher_keys
+        originals = ([self.normalized_courses[key] for key in self._course_keys]
+                     + [self._all_teachers[key] for key in self._teacher_keys])
+        n_courses = len(self._course_keys)
+        return keys, originals, slice(0, n_courses), slice(n_courses, len(keys))
+
+    def _build_automaton(self):
+        automaton = ahocorasick.Automaton()
+        for norm_name, original in self.normalized_courses.items():
+            automaton.add_word(norm_name, ("COURSE", original))
+        for norm_name, original in self.normalized_teachers.items():
+            automaton.add_word(norm_name, ("TEACHER", original))
+        # An automaton without words cannot be searched, so skip the exact-match pass entirely
+        if len(automaton) == 0:
+            return None
+        automaton.make_automaton()
+        return automaton
+
     def _normalize_text(self, text):
         return text.lower().strip()
 
@@ -69,57 +220,110 @@ class UniversityChatbot:
             return time_obj.strftime('%H:%M')
         return str(time_obj) if time_obj else "time not set"
 
+    def _format_lecture_rows(self, df, template, require_day=False, require_room=False):
+        lines = []
+        for course, teacher, day, time_obj, room in zip(df["Course"].values, df["Teacher"].values,
+                                                        df["Day"].values, df["Time"].values, df["Room"].values):
+            if pd.isna(time_obj) or (require_day and not day) or (require_room and not room):
+                continue
+            lines.append(template.format(course=course, teacher=teacher, day=day,
+                                         time=self._format_time(time_obj), room=room))
+        return lines
+
+    def _format_exam_rows(self, df):
+        dates = df["Exam Date"].dt.strftime("%d.%m.%Y")
+        return [f"- {exam_type} on {date} at {self._format_time(exam_time)}"
+                for exam_type, date, exam_time in zip(df["Exam Type"].values, dates.values, df["Exam Time"].values)
+                if pd.notna(date)]
+
     def _setup_nlp(self, lang):
+        patterns = self._ruler_patterns()
+        # Keyed on the patterns so a pipeline built for another schedule is never reused
+        digest = hashlib.sha1(json.dumps(patterns, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+        cache_path = os.path.join(NLP_CACHE_DIR, f"nlp_{lang}_{digest}")
+        nlp = self._load_cached_nlp(cache_path, LANGUAGES[lang]['model'])
+        if nlp is None:
+            nlp = self._build_nlp(lang, patterns)
+            try:
+                # to_disk only creates the last path component
+                os.makedirs(NLP_CACHE_DIR, exist_ok=True)
+                nlp.to_disk(cache_path)
+            except OSError:
+                pass
+        matcher = PhraseMatcher(nlp.vocab)
+        for label, terms in LANGUAGES[lang]['keywords'].items():
+            matcher.add(label.upper(), list(nlp.tokenizer.pipe(terms)))
+        if lang == 'en':
+            self.matcher_en = matcher
+        else:
+            self.matcher_tr = matcher
+        return nlp
+
+    def _load_cached_nlp(self, cache_path, model_path):
+        # The cache is stale once the source model (e.g. a retrained output/model-last) is newer than it
+        config_path = os.path.join(cache_path, "config.cfg")
+        if not os.path.exists(config_path) or os.path.getmtime(config_path) < _newest_mtime(model_path):
+            return None
         try:
-            nlp = spacy.load(LANGUAGES[lang]['model'])
-        except OSError:
-            raise ValueError(f"Model {LANGUAGES[lang]['model']} not found.")
-        if "entity_ruler" not in nlp.pipe_names:
-            nlp.add_pipe("entity_ruler", before="ner")
-        ruler = nlp.get_pipe("entity_ruler")
+            return spacy.load(cache_path, disable=DISABLED_PIPES)
+        except (OSError, ValueError):
+            return None
+
+    def _ruler_patterns(self):
         patterns = []
         for course in self.normalized_courses.values():
             patterns.append({"label": "COURSE", "pattern": course})
         for teacher in self.normalized_teachers.values():
             patterns.append({"label": "TEACHER", "pattern": teacher})
+        return patterns
+
+    def _build_nlp(self, lang, patterns):
+        try:
+            nlp = spacy.load(LANGUAGES[lang]['model'], disable=DISABLED_PIPES)
+        except OSError:
+            raise ValueError(f"Model {LANGUAGES[lang]['model']} not found.")
+        if "entity_ruler" not in nlp.pipe_names:
+            nlp.add_pipe("entity_ruler", before="ner")
+        ruler = nlp.get_pipe("entity_ruler")
         ruler.add_patterns(patterns)
-        matcher = PhraseMatcher(nlp.vocab)
-        for label, terms in LANGUAGES[lang]['keywords'].items():
-            matcher.add(label.upper(), [nlp.make_doc(text) for text in terms])
-        if lang == 'en':
-            self.matcher_en = matcher
-        else:
-            self.matcher_tr = matcher
         return nlp
 
     def detect_language(self, text):
-        tr_words = ['ders', 'hoca', 'vize', 'final']
-        return 'tr' if any(word in text.lower() for word in tr_words) else 'en'
+        return _detect_language(self._normalize_text(text))
 
     def predict_intent(self, text):
-        processed = self._normalize_text(text)
+        return self._predict_cached(self._normalize_text(text))
+
+    def _predict_normalized(self, processed):
         vec = self.vectorizer.transform([processed])
         return self.model.predict(vec)[0]
 
-    def fuzzy_match_entity(self, text, candidates, threshold=70):
+    def _parse(self, text, lang):
+        nlp = self.nlp_tr if lang == 'tr' else self.nlp_en
+        return next(nlp.pipe([text], batch_size=1))
+
+    def fuzzy_match_entity(self, text, candidates, keys, choices, threshold=FUZZY_SCORE_CUTOFF):
+        # choices holds keys already run through _fuzzy_process, in the same order
         if not text:
             return None
-        normalized_text = self._normalize_text(text)
-        match, score = process.extractOne(normalized_text, candidates.keys(), scorer=fuzz.token_sort_ratio)
-        if score >= threshold:
-            return candidates[match]
+        query = _fuzzy_process(self._normalize_text(text))
+        match = process.extractOne(query, choices, scorer=fuzz.token_sort_ratio, score_cutoff=threshold)
+        if match:
+            return candidates[keys[match[2]]]
         return None
 
-    def _update_context(self, query, intent, entities):
-        interaction = {
-            'query': query,
-            'intent': intent,
-            'entities': entities.copy(),
-            'timestamp': datetime.now()
-        }
-        self.context['history'].append(interaction)
-        if len(self.context['history']) > 5:
-            self.context['history'] = self.context['history'][-5:]
+    def _best_in_span(self, scores, span):
+        segment = scores[span]
+        if segment.size == 0:
+            return None
+        best = int(np.argmax(segment))
+        # cdist zeroes every score below score_cutoff
+        if segment[best] == 0:
+            return None
+        return self._all_originals[span.start + best]
+
+    def _update_context(self, entities):
+        self.context['recent'].append((entities.get('teacher'), entities.get('course')))
         self.context['last_course'] = entities.get('course', self.context['last_course'])
         self.context['last_teacher'] = entities.get('teacher', self.context['last_teacher'])
         self.context['last_day'] = entities.get('day', self.context['last_day'])
@@ -129,7 +333,7 @@ class UniversityChatbot:
         lang = self.detect_language(text)
         nlp = self.nlp_tr if lang == 'tr' else self.nlp_en
         matcher = self.matcher_tr if lang == 'tr' else self.matcher_en
-        doc = nlp(text)
+        doc = self._parse_cached(text, lang)
 
         entities = {
             'course': None,
@@ -140,31 +344,28 @@ class UniversityChatbot:
             'building': None
         }
 
-        pronouns = {
-            'en': ['he', 'she', 'her', 'him', 'it'],
-            'tr': ['o', 'onun', 'ona']
-        }
-        is_followup = any(pronoun in normalized for pronoun in pronouns[lang]) or 'about' in normalized or 'hakkında' in normalized
+        is_followup = bool(self._followup_re[lang].search(normalized))
 
-        for norm_name, original in self.normalized_courses.items():
-            if norm_name in normalized:
-                entities['course'] = original
-                break
-        for norm_name, original in self.normalized_teachers.items():
-            if norm_name in normalized:
-                entities['teacher'] = original
-                break
-
-        if not entities['course']:
-            entities['course'] = self.fuzzy_match_entity(normalized, self.normalized_courses)
-        if not entities['teacher']:
-            entities['teacher'] = self.fuzzy_match_entity(normalized, self.normalized_teachers)
+        if self.automaton is not None:
+            for _, (label, original) in self.automaton.iter(normalized):
+                key = label.lower()
+                if not entities[key]:
+                    entities[key] = original
+                if entities['course'] and entities['teacher']:
+                    break
+
+        if not (entities['course'] and entities['teacher']):
+            scores = process.cdist([_fuzzy_process(normalized)], self._all_choices, scorer=fuzz.token_sort_ratio,
+                                   score_cutoff=FUZZY_SCORE_CUTOFF)[0]
+            if not entities['course']:
+                entities['course'] = self._best_in_span(scores, self._course_span)
             if not entities['teacher']:
-                entities['teacher'] = self.fuzzy_match_entity(normalized, self.normalized_teachers_no_titles)
+                entities['teacher'] = self._best_in_span(scores, self._teacher_span)
 
         for ent in doc.ents:
             if ent.label_ == "COURSE":
-                teacher_match = self.fuzzy_match_entity(ent.text, self.normalized_teachers_no_titles)
+                teacher_match = self.fuzzy_match_entity(ent.text, self._all_teachers, self._teacher_keys,
+                                                        self._teacher_choices)
                 if teacher_match:
                     entities['teacher'] = teacher_match
                     entities['course'] = None
@@ -177,15 +378,17 @@ class UniversityChatbot:
             elif ent.label_ == "TIME":
                 entities['time'] = ent.text
             elif ent.label_ == "PERSON" and not entities['teacher']:
-                entities['teacher'] = self.fuzzy_match_entity(ent.text, self.normalized_teachers_no_titles)
+                entities['teacher'] = self.fuzzy_match_entity(ent.text, self._all_teachers, self._teacher_keys,
+                                                              self._teacher_choices)
 
         if is_followup or not any([entities['course'], entities['teacher']]):
-            for interaction in reversed(self.context['history']):
-                if not entities['teacher'] and interaction['entities'].get('teacher'):
-                    entities['teacher'] = interaction['entities']['teacher']
+            # Take whichever of teacher/course the most recent turn mentioning one of them had
+            for teacher, course in reversed(self.context['recent']):
+                if not entities['teacher'] and teacher:
+                    entities['teacher'] = teacher
                     break
-                if not entities['course'] and interaction['entities'].get('course'):
-                    entities['course'] = interaction['entities']['course']
+                if not entities['course'] and course:
+                    entities['course'] = course
                     break
 
         turkish_days = {
@@ -217,22 +420,20 @@ class UniversityChatbot:
                 entities[key] = doc[start:end].text
 
         for token in doc:
-            if token.text in UNIVERSITY_TERMS['buildings']:
+            if token.text in self._buildings:
                 entities['building'] = token.text
 
-        exam_keywords = {
-            'en': ['midterm', 'final', 'makeup'],
-            'tr': ['vize', 'final', 'bütünleme']
-        }
+        exam_keywords = self._exam_kw[lang]
         for token in doc:
-            if token.lemma_.lower() in exam_keywords[lang]:
+            if token.lemma_.lower() in exam_keywords:
                 entities['exam_type'] = token.lemma_.lower()
 
         return entities
 
-    def generate_response(self, text, entities):
-        intent = self.predict_intent(text)
-        self._update_context(text, intent, entities)
+    def generate_response(self, text, entities, intent=None):
+        if intent is None:
+            intent = self.predict_intent(text)
+        self._update_context(entities)
         if intent == "greeting":
             return random.choice(["Merhaba! 📚 How can I assist you today?", "Hi! Ready to help with your schedule. 😊"])
         elif intent == "goodbye":
@@ -243,39 +444,32 @@ class UniversityChatbot:
             course = entities.get("course") or self.context["last_course"]
             day = entities.get("day") or self.context["last_day"]
             if course:
-                df = self.df[(self.df["Course"] == course) & (self.df["Exam Type"] == "Lecture")]
                 if day:
-                    df = df[df["Day"] == day]
-                if not df.empty:
-                    response = f"📚 Schedule for {course}:\n"
-                    for _, row in df.iterrows():
-                        if pd.notna(row["Time"]) and row["Day"]:
-                            response += f"- {row['Day']} at {self._format_time(row['Time'])} in room {row['Room']}\n"
-                    return response.strip()
+                    df = self._lecture_by_course_day.get((course, day))
+                else:
+                    df = self._lecture_by_course.get(course)
+                if df is not None:
+                    lines = self._format_lecture_rows(df, "- {day} at {time} in room {room}", require_day=True)
+                    return "\n".join([f"📚 Schedule for {course}:"] + lines).strip()
                 return f"No schedule found for {course}."
             return "Which course's schedule would you like to know?"
         elif intent == "exam_info":
             course = entities.get("course") or self.context["last_course"]
             exam_type = entities.get("exam_type")
             if course:
-                df = self.df[(self.df["Course"] == course) & (self.df["Exam Type"].isin(["Midterm", "Final", "Makeup"]))]
-                if exam_type:
-                    df = df[df["Exam Type"].str.lower() == exam_type.lower()]
-                if not df.empty:
-                    response = f"📝 Exam info for {course}:\n"
-                    for _, row in df.iterrows():
-                        if pd.notna(row["Exam Date"]):
-                            date = row["Exam Date"].strftime("%d.%m.%Y")
-                            time = self._format_time(row["Exam Time"])
-                            response += f"- {row['Exam Type']} on {date} at {time}\n"
-                    return response.strip()
+                df = self._exams_by_course.get(course)
+                if df is not None and exam_type:
+                    df = df[df["Exam Type Lower"] == exam_type.lower()]
+                if df is not None and not df.empty:
+                    lines = self._format_exam_rows(df)
+                    return "\n".join([f"📝 Exam info for {course}:"] + lines).strip()
                 return f"No exam info found for {course}."
             return "Which course's exam info would you like?"
         elif intent == "teacher_info":
             teacher = entities.get("teacher") or self.context["last_teacher"]
             if teacher:
-                df = self.df[(self.df["Teacher"] == teacher) & (self.df["Exam Type"] == "Lecture")]
-                if not df.empty:
+                df = self._lecture_by_teacher.get(teacher)
+                if df is not None:
                     courses = df["Course"].unique()
                     return f"👨‍🏫 {teacher} teaches: {', '.join(courses)}"
                 return f"No courses found for {teacher}."
@@ -284,39 +478,26 @@ class UniversityChatbot:
             course = entities.get("course") or self.context["last_course"]
             day = entities.get("day") or self.context["last_day"]
             if course:
-                df = self.df[(self.df["Course"] == course) & (self.df["Exam Type"] == "Lecture")]
                 if day:
-                    df = df[df["Day"] == day]
-                if not df.empty:
-                    response = f"🏫 Rooms for {course}:\n"
-                    for _, row in df.iterrows():
-                        if row["Room"] and pd.notna(row["Time"]):
-                            response += f"- {row['Day']} at {self._format_time(row['Time'])} in room {row['Room']}\n"
-                    return response.strip()
+                    df = self._lecture_by_course_day.get((course, day))
+                else:
+                    df = self._lecture_by_course.get(course)
+                if df is not None:
+                    lines = self._format_lecture_rows(df, "- {day} at {time} in room {room}", require_room=True)
+                    return "\n".join([f"🏫 Rooms for {course}:"] + lines).strip()
                 return f"No room info found for {course}."
             return "Which course's room info would you like?"
         elif intent == "daily_schedule":
             day = entities.get("day") or self.context["last_day"]
             if day:
-                df = self.df[(self.df["Day"] == day) & (self.df["Exam Type"] == "Lecture")]
-                if not df.empty:
-                    response = f"📅 Schedule for {day}:\n"
-                    for _, row in df.iterrows():
-                        if pd.notna(row["Time"]):
-                            response += f"- {row['Course']} at {self._format_time(row['Time'])} in room {row['Room']} (Teacher: {row['Teacher']})\n"
-                    return response.strip()
+                df = self._lecture_by_day.get(day)
+                if df is not None:
+                    lines = self._format_lecture_rows(df, "- {course} at {time} in room {room} (Teacher: {teacher})")
+                    return "\n".join([f"📅 Schedule for {day}:"] + lines).strip()
                 return f"No classes found for {day}."
             return "Which day's schedule would you like?"
         elif intent == "schedule_conflict":
-            df = self.df[self.df["Exam Type"] == "Lecture"]
-            conflicts = []
-            for day in df["Day"].unique():
-                day_df = df[df["Day"] == day]
-                for time in day_df["Time"].unique():
-                    if pd.notna(time):
-                        time_df = day_df[day_df["Time"] == time]
-                        if len(time_df) > 1:
-                            conflicts.append((day, time, time_df["Course"].tolist()))
+            conflicts = self._conflicts
             if conflicts:
                 response = "⚠️ Schedule conflicts:\n"
                 for day, time, courses in conflicts:
@@ -326,13 +507,10 @@ class UniversityChatbot:
         elif intent == "teacher_schedule":
             teacher = entities.get("teacher") or self.context["last_teacher"]
             if teacher:
-                df = self.df[(self.df["Teacher"] == teacher) & (self.df["Exam Type"] == "Lecture")]
-                if not df.empty:
-                    response = f"👨‍🏫 {teacher}'s teaching schedule:\n"
-                    for _, row in df.iterrows():
-                        if pd.notna(row["Time"]) and row["Day"]:
-                            response += f"- {row['Course']} on {row['Day']} at {self._format_time(row['Time'])} in room {row['Room']}\n"
-                    return response.strip()
+                df = self._lecture_by_teacher.get(teacher)
+                if df is not None:
+                    lines = self._format_lecture_rows(df, "- {course} on {day} at {time} in room {room}", require_day=True)
+                    return "\n".join([f"👨‍🏫 {teacher}'s teaching schedule:"] + lines).strip()
                 return f"No schedule found for {teacher}."
             return "Which teacher's schedule would you like to know about?"
         elif intent == "course_availability":
@@ -358,6 +536,12 @@ class UniversityChatbot:
             return "I'm Unibot, your friendly university schedule assistant! 😊"
         return "Sorry, I didn’t understand. Could you clarify?"
 
+@st.cache_resource(max_entries=1)
+def get_chatbot(excel_path, mtime):
+    # One instance per process (and schedule version), shared by every browser session
+    return UniversityChatbot(excel_path)
+
+
 def main():
     st.set_page_config(page_title="University Chatbot", layout="centered")
 
@@ -366,7 +550,8 @@ def main():
     # Initialize chatbot
     if 'chatbot' not in st.session_state:
         try:
-            st.session_state.chatbot = UniversityChatbot('cleaned_schedule.xlsx')
+            excel_path = 'cleaned_schedule.xlsx'
+            st.session_state.chatbot = get_chatbot(excel_path, os.path.getmtime(excel_path)).new_session()
         except Exception as e:
             st.error(f"Chatbot başlatılamadı: {e}")
             return
@@ -392,8 +577,10 @@ def main():
 
         # Process input
         try:
-            entities = st.session_state.chatbot.extract_entities(prompt)
-            response = st.session_state.chatbot.generate_response(prompt, entities)
+            chatbot = st.session_state.chatbot
+            entities = chatbot.extract_entities(prompt)
+            intent = chatbot.predict_intent(prompt)
+            response = chatbot.generate_response(prompt, entities, intent)
         except Exception as e:
             response = f"⚠️ Hata: {e}"
 
@@ -1,3 +1,6 @@
+# Built spaCy pipelines (with the schedule's entity_ruler patterns) are saved here
+NLP_CACHE_DIR = 'cache'
+
 LANGUAGES = {
     'en': {
         'model': 'en_core_web_sm-3.4.1',
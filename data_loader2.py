@@ -1,12 +1,53 @@
+import logging
+import os
 import pandas as pd
 from datetime import datetime, time
 
-def load_schedule_data(file_path):
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['Course', 'Teacher', 'Day', 'Time', 'Room', 'Exam Type', 'Exam Date', 'Exam Time']
+# Part of the Parquet cache file name; bump it whenever the preprocessing output changes
+CACHE_VERSION = 1
+
+
+def _read_excel(file_path, columns):
+    """Read only the given columns, preferring the faster calamine engine when installed."""
+    usecols = lambda col: col in columns
+    try:
+        return pd.read_excel(file_path, usecols=usecols, engine='calamine')
+    except (ImportError, ValueError):
+        # ImportError: python-calamine missing; ValueError: pandas < 2.2 has no calamine engine
+        return pd.read_excel(file_path, usecols=usecols, engine='openpyxl')
+
+
+def _versioned_cache_path(cache_path):
+    """Insert CACHE_VERSION before the extension so caches from older preprocessing are never read."""
+    root, ext = os.path.splitext(cache_path)
+    return f"{root}.v{CACHE_VERSION}{ext or '.parquet'}"
+
+
+def _read_cache(cache_path, file_path):
+    """Return the cached DataFrame if it is at least as new as the Excel file, else None."""
+    try:
+        if os.path.getmtime(cache_path) < os.path.getmtime(file_path):
+            return None
+        return pd.read_parquet(cache_path)
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+def load_schedule_data(file_path, cache_path=None):
     """
     Load and preprocess university schedule data from an Excel file.
 
+    The processed DataFrame is cached as Parquet next to the Excel file and
+    reused until the Excel file or CACHE_VERSION changes.
+
     Args:
         file_path (str): Path to the Excel file.
+        cache_path (str, optional): Path of the Parquet cache, with
+            CACHE_VERSION inserted before the extension. Defaults to the
+            Excel path with a .parquet extension.
 
     Returns:
         pd.DataFrame: Processed schedule data with standardized formats.
@@ -16,22 +57,30 @@ def load_schedule_data(file_path):
         KeyError: If required columns are missing in the Excel file.
         ValueError: If critical data preprocessing steps fail.
     """
+    if cache_path is None:
+        cache_path = os.path.splitext(file_path)[0] + '.parquet'
+    cache_path = _versioned_cache_path(cache_path)
+    df = _read_cache(cache_path, file_path)
+    if df is not None:
+        return df
+
     # Validate file existence
     try:
-        df = pd.read_excel(file_path, engine='openpyxl')
+        df = _read_excel(file_path, REQUIRED_COLUMNS)
     except FileNotFoundError:
         raise FileNotFoundError(f"Excel file not found at: {file_path}")
     except Exception as e:
         raise ValueError(f"Failed to load Excel file: {str(e)}")
 
     # Validate required columns
-    required_columns = ['Course', 'Teacher', 'Day', 'Time', 'Room', 'Exam Type', 'Exam Date', 'Exam Time']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing_columns:
         raise KeyError(f"Missing required columns in Excel file: {', '.join(missing_columns)}")
 
     # Clean and preprocess data
     df.fillna('', inplace=True)
+    # Rooms mix numbers and names (202, 'UZEM'); keep them as text so the frame serializes
+    df['Room'] = df['Room'].astype(str)
 
     # Convert exam dates to datetime objects
     df['Exam Date'] = pd.to_datetime(
@@ -48,49 +97,34 @@ def load_schedule_data(file_path):
         'Makeup': 'Makeup'
     }
     df['Exam Type'] = df['Exam Type'].map(exam_type_mapping).fillna(df['Exam Type'])
+    # Lowercased once here so exam-type lookups don't lowercase the column per query
+    df['Exam Type Lower'] = df['Exam Type'].str.lower().astype('category')
 
-    # Clean time strings: replace '.' with ':' and handle ranges
-    def clean_time(x):
-        if isinstance(x, str) and x.strip():
-            # Replace dots with colons
-            x = x.replace('.', ':')
-            # If it's a range (e.g., "08:00-10:00"), take the start time
-            if '-' in x:
-                x = x.split('-')[0].strip()
-            # Debug: Log cleaned time
-            print(f"Cleaned time: '{x}'")
-            return x
-        return ''
-
-    # Apply time cleaning to both Time and Exam Time
-    df['Time'] = df['Time'].apply(clean_time)
-    df['Exam Time'] = df['Exam Time'].apply(clean_time)
-
-    # Convert times to datetime.time objects
-    def to_time_obj(time_str):
-        if time_str and isinstance(time_str, str):
-            try:
-                # Try HH:MM:SS format first
-                dt = pd.to_datetime(time_str, format='%H:%M:%S', errors='coerce')
-                if not pd.isna(dt):
-                    result = dt.time()
-                    print(f"Parsed '{time_str}' as {result} (HH:MM:SS)")
-                    return result
-                # Fallback to HH:MM format
-                dt = pd.to_datetime(time_str, format='%H:%M', errors='coerce')
-                if not pd.isna(dt):
-                    result = dt.time()
-                    print(f"Parsed '{time_str}' as {result} (HH:MM)")
-                    return result
-                print(f"Failed to parse time: '{time_str}'")
-                return None
-            except Exception as e:
-                print(f"Error parsing '{time_str}': {str(e)}")
-                return None
-        return None
-
+    # Clean time strings: replace '.' with ':' and take the start of ranges
+    # (e.g. "08:00-10:00"), then parse HH:MM:SS with an HH:MM fallback
     for col in ['Time', 'Exam Time']:
-        df[col] = df[col].apply(to_time_obj)
+        cleaned = df[col].astype(str).str.replace('.', ':', regex=False)
+        cleaned = cleaned.str.split('-').str[0].str.strip()
+        parsed = pd.to_datetime(cleaned, format='%H:%M:%S', errors='coerce').combine_first(
+            pd.to_datetime(cleaned, format='%H:%M', errors='coerce')
+        )
+        # One summary line per column instead of the old per-row prints
+        if logger.isEnabledFor(logging.DEBUG):
+            failed = cleaned[parsed.isna() & cleaned.ne('')]
+            if not failed.empty:
+                logger.debug("Failed to parse %d %s value(s): %s", len(failed), col, sorted(set(failed)))
+        # Keep unparseable or empty times as None rather than NaT
+        df[col] = parsed.dt.time.astype(object).where(parsed.notna(), None)
+
+    # Low-cardinality text columns compare and group much faster as categoricals
+    for col in ['Course', 'Teacher', 'Day', 'Exam Type']:
+        df[col] = df[col].astype('category')
+
+    # Caching is best effort: a missing Parquet engine or read-only directory just skips it
+    try:
+        df.to_parquet(cache_path)
+    except (ImportError, OSError, TypeError, ValueError):
+        pass
 
     return df
 